@@ -1,8 +1,9 @@
-import functools
 import itertools
 import operator
+import railroads_hillclimber.planstore as planstore
 import railroads_hillclimber.prefab as prefab
 import railroads_hillclimber.prepper as prepper
+import railroads_hillclimber.simulator as simulator
 import railroads_hillclimber.splitter as splitter
 import railroads_hillclimber.stock as stock
 import typing
@@ -12,7 +13,11 @@ def compute_climb(
         grade: float,
         *,
         power_ratio: float = 1.0,
-        collect_net: bool = False) -> typing.Sequence[
+        collect_net: bool = False,
+        siding_length: typing.Optional[float] = None,
+        siding_cars: typing.Optional[int] = None,
+        plans: typing.Optional[planstore.PlanStore] = None
+        ) -> typing.Sequence[
                  typing.Tuple[stock.Train, typing.Optional[stock.Train]]]:
     """Compute a sequence for climbing grade.
 
@@ -28,25 +33,124 @@ def compute_climb(
     powerful enough to make the grade on its own, we add it to the
     collection of units used for power. This will technically result in
     rearrangement of the train.
+    siding_length -- If not None, the length of the siding at the top of the
+    grade, in feet. Each subcut is limited to this length.
+    siding_cars -- If not None, the number of cars the siding at the top of
+    the grade can hold. Each subcut is limited to this many cars.
+    plans -- If not None, a PlanStore to take the split from instead of
+    solving it, when it has one for train. Not used with siding limits.
 
     The return value is a sequence of pairs, such that for every pair, the
     first element is the train that's making it up the grade and the second
     element is the train that's heading back down. Note that, once the
     entire train is at the top, the second element will be None.
+
+    Raises ValueError if no split of the train can climb grade, e.g. when
+    the power at the front can't climb it or a unit doesn't fit in the
+    siding on its own.
     """
-    power_len = prepper.collect_front_len(train, grade, power_ratio)
+    if len(train) == 0:
+        return [(stock.Train(()), None)]
+    plan = None
+    if plans is not None and siding_length is None and siding_cars is None:
+        plan = plans.lookup(train, grade,
+                power_ratio=power_ratio,
+                collect_net=collect_net)
+    if plan is not None:
+        power_len, splits = plan
+    else:
+        power_len = prepper.collect_front_len(train, grade, power_ratio)
     power = stock.Train(train[:power_len])
     cut = stock.Train(train[power_len:])
-    splits = splitter.compute_split(power, cut, grade,
-            power_ratio=power_ratio,
-            collect_net=collect_net)
+    if plan is None:
+        splits = splitter.compute_split(power, cut, grade,
+                power_ratio=power_ratio,
+                collect_net=collect_net,
+                max_length=siding_length,
+                max_cars=siding_cars)
+    if splits is None:
+        raise _no_split_error(siding_length, siding_cars)
+    elif len(cut) == 0:
+        return [(power, None)]
+    return _assemble_trips(power, cut, splits, grade, power_ratio)
+
+def fastest_climb(
+        train: stock.Train,
+        grade: float,
+        *,
+        power_ratio: float = 1.0,
+        collect_net: bool = False,
+        siding_length: typing.Optional[float] = None,
+        siding_cars: typing.Optional[int] = None,
+        model: simulator.CostModel = simulator.CostModel()
+        ) -> typing.Sequence[
+                 typing.Tuple[stock.Train, typing.Optional[stock.Train]]]:
+    """Compute the sequence for climbing grade that takes the least time.
+
+    This works like compute_climb, but rather than using the fewest subcuts,
+    it estimates the time of every move with model (see simulator.expand)
+    and picks the fastest plan. Every way of collecting power from the front
+    of train is considered, and subcuts may be more numerous if lighter
+    trips climb fast enough to make up for it.
+
+    The arguments, return value and errors are as for compute_climb, plus:
+
+    model -- The simulator.CostModel to estimate times with.
+    """
+    if len(train) == 0:
+        return [(stock.Train(()), None)]
+    best = None
+    clusters = itertools.accumulate(
+            prepper.cluster_forces(train, grade, power_ratio),
+            lambda a, b: (a[0]+b[0], a[1]+b[1]))
+    for power_len, force in clusters:
+        if force <= 0 or (power_len < len(train)
+                and train[power_len].net_force(grade, power_ratio) > 0):
+            continue
+        power = stock.Train(train[:power_len])
+        cut = stock.Train(train[power_len:])
+        if len(cut) == 0:
+            trips = [(power, None)]
+            seconds = sum(map(operator.attrgetter('seconds'),
+                simulator.expand(trips, grade,
+                    power_ratio=power_ratio, model=model)))
+            found = seconds, ()
+        else:
+            found = simulator.fastest_split(power, cut, grade,
+                    power_ratio=power_ratio,
+                    collect_net=collect_net,
+                    max_length=siding_length,
+                    max_cars=siding_cars,
+                    model=model)
+        if found is not None and (best is None or found[0] < best[0]):
+            best = found[0], power, cut, found[1]
+    if best is None:
+        raise _no_split_error(siding_length, siding_cars)
+    _, power, cut, splits = best
+    if len(cut) == 0:
+        return [(power, None)]
+    return _assemble_trips(power, cut, splits, grade, power_ratio)
+
+def _no_split_error(siding_length, siding_cars):
+    """Build the error for a train that can't be split to climb a grade."""
+    limits = [f"{name}={value}" for name, value in (
+        ('siding_length', siding_length),
+        ('siding_cars', siding_cars)) if value is not None]
+    if limits:
+        return ValueError("train can't be split to climb grade within "
+                + " and ".join(limits))
+    return ValueError("train can't be split to climb grade")
+
+def _assemble_trips(power, cut, splits, grade, power_ratio):
+    """Build the trips for bringing cut up grade with power using splits."""
     subcuts = splitter.split_to_subcuts(cut, splits)
-    subcuts, add_power = itertools.tee(subcuts)
-    add_power = (filter(operator.methodcaller(
-        'can_climb', grade=grade, power_ratio=power_ratio), x)
-        for x in add_power)
-    add_power = (functools.reduce(operator.add, x, stock.Train(()))
-            for x in add_power)
+    climbers = tuple(x > 0 for x in stock.net_forces(
+        map(operator.attrgetter('mass'), cut),
+        map(operator.attrgetter('tractive_effort'), cut),
+        grade,
+        power_ratio))
+    add_power = (stock.Train(itertools.compress(cut[x], climbers[x]))
+            for x in splitter.split_to_slices(splits))
     trip_power = itertools.accumulate(itertools.chain(
         (power,),
         add_power))
@@ -0,0 +1,352 @@
+import collections
+import itertools
+import random
+import railroads_hillclimber as rh
+import railroads_hillclimber.prepper as prepper
+import railroads_hillclimber.splitter as splitter
+import railroads_hillclimber.stock as stock
+from typing import Callable, Iterable, Iterator, Optional, Sequence, Tuple
+
+Case = collections.namedtuple('Case', 'capacity cut collect_net limits')
+Case.__doc__ = """A splitting problem.
+
+capacity -- Amount of head force capacity available.
+cut -- Forces for each unit in the cut.
+collect_net -- If True, when a subcut has a positive force, it is added to
+power for future subcuts.
+limits -- Pairs of a maximum and the sizes of each unit in the cut, as for
+splitter.boundedsplit.
+"""
+
+Failure = collections.namedtuple('Failure', 'algorithm case result expected')
+Failure.__doc__ = """A splitter result that disagrees with the oracle.
+
+algorithm -- Name of the splitter.
+case -- The (shrunk) Case that the splitter got wrong.
+result -- What the splitter returned.
+expected -- What the oracle returned.
+"""
+
+def is_valid_split(
+        case: Case,
+        split: Optional[Sequence[int]]) -> bool:
+    """Determine if split is a valid solution to case.
+
+    Every subcut must have a strictly positive net force against the
+    capacity available when it is pulled, and must fit within every limit.
+    None is never valid.
+    """
+    if split is None or sum(split) != len(case.cut) or 0 in split:
+        return False
+    capacity = case.capacity
+    for s in splitter.split_to_slices(split):
+        this_cut = case.cut[s]
+        if capacity + sum(this_cut) <= 0:
+            return False
+        for maximum, sizes in case.limits:
+            if sum(sizes[s]) > maximum:
+                return False
+        if case.collect_net:
+            capacity += sum(x for x in this_cut if x>0)
+    return True
+
+def exactsplit(case: Case) -> Optional[Tuple[int]]:
+    """Solve case by brute force.
+
+    Exponential in the cut length; only use this on small cuts. Subcut
+    counts are tried in increasing order, so the first valid split found
+    uses the fewest subcuts.
+    """
+    n = len(case.cut)
+    if n == 0:
+        return ()
+    for parts in range(1, n+1):
+        for cuts in itertools.combinations(range(1, n), parts-1):
+            bounds = (0,) + cuts + (n,)
+            split = tuple(b - a for a, b in zip(bounds, bounds[1:]))
+            if is_valid_split(case, split):
+                return split
+    return None
+
+def _check_optimal(case, result):
+    expected = exactsplit(case)
+    if expected is None:
+        return result is None, expected
+    return (is_valid_split(case, result)
+            and len(result) == len(expected)), expected
+
+def _check_valid(case, result):
+    return result is None or is_valid_split(case, result), None
+
+def _nonpositive(case):
+    return max(case.cut, default=0.0) <= 0
+
+# Each splitter is paired with a predicate saying when it claims
+# optimality; otherwise only validity of a non-None result is checked.
+SPLITTERS = {
+    'quicksplit': (
+        lambda c: splitter.quicksplit(c.capacity, c.cut),
+        lambda c: not c.collect_net and not c.limits,
+        _nonpositive),
+    'fastsplit': (
+        lambda c: splitter.fastsplit(c.capacity, c.cut, c.collect_net),
+        lambda c: not c.limits,
+        lambda c: c.collect_net or _nonpositive(c)),
+    'smartsplit': (
+        lambda c: splitter.smartsplit(c.capacity, c.cut),
+        lambda c: not c.collect_net and not c.limits,
+        lambda c: True),
+    'boundedsplit': (
+        lambda c: splitter.boundedsplit(
+            c.capacity, c.cut, c.limits, c.collect_net),
+        lambda c: True,
+        lambda c: True),
+}
+"""Map of splitter names to (run, applies, optimal) callables on a Case."""
+
+def check(name: str, case: Case) -> Optional[Failure]:
+    """Run splitter name on case and compare it against the oracle.
+
+    Returns None if the splitter doesn't apply to case or behaves as
+    documented, or a Failure otherwise.
+    """
+    run, applies, optimal = SPLITTERS[name]
+    if not applies(case):
+        return None
+    result = run(case)
+    if optimal(case):
+        ok, expected = _check_optimal(case, result)
+    else:
+        ok, expected = _check_valid(case, result)
+    if ok:
+        return None
+    return Failure(name, case, result, expected)
+
+def random_case(
+        rng: random.Random,
+        max_len: int = 10) -> Case:
+    """Generate a random Case.
+
+    Forces are multiples of 0.5 so that sums are exact, which keeps
+    boundary conditions (a net force of exactly zero) reproducible.
+    """
+    n = rng.randint(1, max_len)
+    positive_ratio = rng.choice((0.0, 0.1, 0.3))
+    cut = tuple(
+            rng.randint(1, 8) * 0.5 if rng.random() < positive_ratio
+            else rng.randint(-8, 0) * 0.5
+            for _ in range(n))
+    capacity = rng.randint(1, 8) * 0.5
+    collect_net = rng.random() < 0.5
+    if rng.random() < 0.5:
+        sizes = tuple(rng.randint(1, 3) for _ in range(n))
+        limits = ((rng.randint(1, 6), sizes),)
+    else:
+        limits = ()
+    return Case(capacity, cut, collect_net, limits)
+
+def _case_candidates(case):
+    n = len(case.cut)
+    def without(i):
+        return Case(case.capacity, case.cut[:i] + case.cut[i+1:],
+                case.collect_net,
+                tuple((m, s[:i] + s[i+1:]) for m, s in case.limits))
+    for i in range(n):
+        yield without(i)
+    if case.limits:
+        yield case._replace(limits=())
+    if case.collect_net:
+        yield case._replace(collect_net=False)
+    for i, x in enumerate(case.cut):
+        for simpler in (0.0, -1.0, 1.0, float(int(x))):
+            if simpler != x:
+                yield case._replace(
+                        cut=case.cut[:i] + (simpler,) + case.cut[i+1:])
+    for simpler in (1.0, float(int(case.capacity))):
+        if 0 < simpler < case.capacity:
+            yield case._replace(capacity=simpler)
+
+def shrink(
+        failure: Failure,
+        candidates: Callable[[Case], Iterable[Case]] = _case_candidates,
+        recheck: Callable[[str, Case], Optional[Failure]] = check
+        ) -> Failure:
+    """Greedily reduce a failing case while it keeps failing.
+
+    Each round tries the smaller candidates of the current case in turn and
+    restarts from the first one that still fails, until none does.
+    """
+    progress = True
+    while progress:
+        progress = False
+        for candidate in candidates(failure.case):
+            smaller = recheck(failure.algorithm, candidate)
+            if smaller is not None:
+                failure = smaller
+                progress = True
+                break
+    return failure
+
+def fuzz_splitters(
+        seed: int = 0,
+        iterations: int = 1000,
+        max_len: int = 10) -> Iterator[Failure]:
+    """Cross-check every splitter against the oracle on random cases.
+
+    Yields a shrunk Failure for each case and splitter that disagree.
+    """
+    rng = random.Random(seed)
+    for _ in range(iterations):
+        case = random_case(rng, max_len)
+        for name in SPLITTERS:
+            failure = check(name, case)
+            if failure is not None:
+                yield shrink(failure)
+
+ClimbCase = collections.namedtuple('ClimbCase',
+        'train grade power_ratio collect_net siding_length siding_cars',
+        defaults=(None, None))
+ClimbCase.__doc__ = """A compute_climb problem, with arguments as for
+compute_climb."""
+
+def _fits_siding(case, result, power_len):
+    """Determine if every subcut in result fits the siding limits of case."""
+    for up, down in result:
+        subcut = stock.Train(up[power_len:])
+        if ((case.siding_length is not None
+                and subcut.length > case.siding_length)
+            or (case.siding_cars is not None
+                and subcut.car_count > case.siding_cars)):
+            return False
+        if down is not None:
+            power_len = len(down)
+    return True
+
+def check_climb(case: ClimbCase) -> Optional[Failure]:
+    """Run compute_climb on case and compare it against the oracle.
+
+    Every trip up the grade must be able to climb it, the trips must bring
+    up the whole train, and there must be as few as the oracle needs for the
+    same front power.
+    """
+    power_len = prepper.collect_front_len(
+            case.train, case.grade, case.power_ratio)
+    power = stock.Train(case.train[:power_len])
+    cut = stock.Train(case.train[power_len:])
+    if power.can_climb(case.grade, case.power_ratio):
+        expected = exactsplit(Case(
+            power.net_force(case.grade, case.power_ratio),
+            tuple(x.net_force(case.grade, case.power_ratio) for x in cut),
+            case.collect_net,
+            tuple(splitter.cut_limits(cut,
+                max_length=case.siding_length,
+                max_cars=case.siding_cars))))
+    else:
+        expected = None
+    try:
+        result = rh.compute_climb(case.train, case.grade,
+                power_ratio=case.power_ratio,
+                collect_net=case.collect_net,
+                siding_length=case.siding_length,
+                siding_cars=case.siding_cars)
+    except Exception as e:
+        result = e
+    if expected is None:
+        ok = isinstance(result, ValueError)
+    else:
+        ok = (not isinstance(result, Exception)
+            and len(result) == max(len(expected), 1)
+            and all(up.can_climb(case.grade, case.power_ratio)
+                for up, _ in result)
+            and sum(len(up) for up, _ in result) - sum(
+                len(down) for _, down in result[:-1]) == len(case.train)
+            and _fits_siding(case, result, power_len))
+    if ok:
+        return None
+    return Failure('compute_climb', case, result, expected)
+
+def _random_unit(rng, locomotive_ratio):
+    """Generate a plain car, or a locomotive with or without a tender."""
+    if rng.random() >= locomotive_ratio:
+        return stock.Car(name='Car',
+            mass=rng.randint(1, 8) * 10000.0,
+            length=rng.randint(2, 4) * 10.0)
+    locomotive = stock.TractiveCar(
+        name='Locomotive',
+        mass=rng.randint(1, 8) * 10000.0,
+        tractive_effort=rng.randint(1, 8) * 2000.0,
+        length=rng.randint(2, 4) * 10.0)
+    if rng.random() < 0.5:
+        tender = stock.Car(name='Tender',
+            mass=rng.randint(1, 4) * 10000.0, length=20.0)
+        locomotive = stock.CarGroup('Locomotive', (locomotive, tender))
+    return locomotive
+
+def random_climb_case(
+        rng: random.Random,
+        max_len: int = 10) -> ClimbCase:
+    """Generate a random ClimbCase from plain cars and locomotives.
+
+    Some locomotives have tenders, and some cases have a siding limit. The
+    lead unit is usually a locomotive, but may be too weak to climb, or a
+    plain car.
+    """
+    n = rng.randint(1, max_len)
+    units = [_random_unit(rng, 0.8)]
+    units.extend(_random_unit(rng, 0.2) for _ in range(n))
+    siding_length = siding_cars = None
+    siding = rng.random()
+    if siding < 0.2:
+        siding_length = rng.randint(2, 12) * 10.0
+    elif siding < 0.4:
+        siding_cars = rng.randint(1, 5)
+    return ClimbCase(
+            stock.Train(units),
+            rng.randint(1, 10) * 0.01,
+            rng.choice((0.5, 0.75, 1.0)),
+            rng.random() < 0.5,
+            siding_length,
+            siding_cars)
+
+def _climb_candidates(case):
+    for i in range(1, len(case.train)):
+        yield case._replace(
+                train=stock.Train(case.train[:i] + case.train[i+1:]))
+    if case.collect_net:
+        yield case._replace(collect_net=False)
+    if case.siding_length is not None or case.siding_cars is not None:
+        yield case._replace(siding_length=None, siding_cars=None)
+
+def fuzz_climb(
+        seed: int = 0,
+        iterations: int = 300,
+        max_len: int = 10) -> Iterator[Failure]:
+    """Cross-check compute_climb against the oracle on random trains.
+
+    Yields a shrunk Failure for each train that compute_climb gets wrong.
+    """
+    rng = random.Random(seed)
+    recheck = lambda name, case: check_climb(case)
+    for _ in range(iterations):
+        failure = check_climb(random_climb_case(rng, max_len))
+        if failure is not None:
+            yield shrink(failure, _climb_candidates, recheck)
+
+def main(argv: Sequence[str] = ()) -> int:
+    """Run both fuzzers and print shrunk failures.
+
+    Usage: python -m railroads_hillclimber.fuzzer [seed [iterations]]
+    """
+    seed = int(argv[0]) if len(argv) > 0 else 0
+    iterations = int(argv[1]) if len(argv) > 1 else 1000
+    failures = 0
+    for failure in itertools.chain(
+            fuzz_splitters(seed, iterations),
+            fuzz_climb(seed, iterations)):
+        failures += 1
+        print(failure)
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main(sys.argv[1:]))
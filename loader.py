@@ -0,0 +1,184 @@
+import functools
+import itertools
+import math
+import operator
+import railroads_hillclimber.splitter as splitter
+import railroads_hillclimber.stock as stock
+from railroads_hillclimber.prefab.factory import CargoHelper, difficulty
+from typing import Callable, Iterable, Sequence
+
+def trip_lower_bound(
+        power: stock.Calculative,
+        cargo_mass: float,
+        grade: float,
+        power_ratio: float = 1.0) -> int:
+    """Find the fewest trips that could possibly bring cargo_mass up grade.
+
+    Every subcut must weigh less than power can pull, so this ignores the
+    cars themselves and assumes every trip is loaded to the limit.
+    """
+    capacity = power.net_force(grade=grade, power_ratio=power_ratio)
+    per_pound = (grade + 0.004) / math.sqrt(grade * grade + 1)
+    return math.floor(cargo_mass * per_pound / capacity) + 1
+
+def _coverage(cars, names):
+    """Build a test of whether cars[i:] can hold the cargo still left.
+
+    The returned covers(i, left) takes left as counts in the order of
+    names. Each car holds a single kind of cargo, so this is an exact search
+    over the cars, memoised on the counts left; loading a car fully is
+    never worse than loading it partly, so only full loads are tried.
+    """
+    @functools.lru_cache(maxsize=None)
+    def covers(i, left):
+        if not any(left):
+            return True
+        elif i == len(cars):
+            return False
+        permitted = cars[i].permitted_cargo
+        for k, name in enumerate(names):
+            take = min(permitted.get(name, 0), left[k])
+            if take > 0 and covers(i+1,
+                    left[:k] + (left[k]-take,) + left[k+1:]):
+                return True
+        return covers(i+1, left)
+    return covers
+
+def _greedy_loads(cars, counts, order, budget, partial, keep_empty, covers):
+    """Load cars in order, filling each trip up to budget pounds.
+
+    order gives the preferred cargo for cars that can take several. If
+    partial is False, a car that can't take a full load starts a new trip
+    instead of taking what fits. A car always takes at least as much as
+    covers (see _coverage) says the cars after it can't hold, so no cargo
+    is left over as long as covers(0, counts) holds. Returns a list of
+    (factory, cargo, count).
+    """
+    names = tuple(counts)
+    left = dict(counts)
+    loads = []
+    trip = 0.0
+    for i, car in enumerate(cars):
+        for helper in order:
+            limit = min(car.permitted_cargo.get(helper.name, 0),
+                    left[helper.name])
+            if limit <= 0:
+                continue
+            def rest(count):
+                return tuple(left[x] - (count if x == helper.name else 0)
+                        for x in names)
+            need = next((k for k in range(limit+1)
+                if covers(i+1, rest(k))), None)
+            if need is None:
+                continue
+            unit = helper.each_mass * difficulty.multiplier
+            def fit(trip):
+                room = budget - trip - car.empty_mass
+                if room <= 0:
+                    return 0
+                elif unit == 0:
+                    return limit
+                return min(limit, math.ceil(room / unit) - 1)
+            count = fit(trip)
+            if count < max(need, 1 if partial else limit) and trip > 0:
+                new_trip = fit(0.0)
+                if new_trip > 0:
+                    trip = 0.0
+                    count = new_trip
+            count = max(count, need)
+            if count > 0:
+                break
+        else:
+            # Nothing the car may carry fits, or is left to carry.
+            if keep_empty:
+                loads.append((car, None, 0))
+                trip += car.empty_mass
+            continue
+        loads.append((car, helper, count))
+        left[helper.name] -= count
+        trip += car.empty_mass + count * unit
+    return loads
+
+def plan_loads(
+        power: stock.Train,
+        cars: Sequence[Callable],
+        cargo: Iterable[CargoHelper],
+        grade: float,
+        *,
+        power_ratio: float = 1.0,
+        keep_empty: bool = False) -> stock.Train:
+    """Distribute cargo across cars so the train climbs grade in the fewest
+    trips.
+
+    Whether the cargo fits in cars at all is settled exactly first. Then
+    candidate loadings are built greedily, filling each trip up to what
+    power can pull with each preferred order of the cargo types (every
+    order for up to four types, otherwise heaviest and lightest first),
+    and are scored by the number of subcuts splitter.quicksplit needs for
+    them, which is exact for unpowered cars. The search stops early once a
+    candidate meets trip_lower_bound, but may otherwise use more trips
+    than needed.
+
+    power -- Unit(s) used for the hillclimbing operation.
+    cars -- Car factories (see prefab.factory.CarFactory) for the available
+    cars, in the order they are coupled.
+    cargo -- CargoHelper instances with the quantity of each cargo to load.
+    grade -- The gradient of the hill.
+    power_ratio -- Maximum power ratio to use.
+    keep_empty -- If True, cars left empty stay in the train; otherwise they
+    are left behind.
+
+    Returns power followed by the loaded cars. Raises ValueError if the
+    cargo can't be loaded into cars, or if no loading found lets power
+    bring every car up grade.
+    """
+    counts = {}
+    helpers = {}
+    for helper in cargo:
+        if helper.count is None:
+            raise ValueError(f"{helper.name} needs a quantity to load")
+        counts[helper.name] = counts.get(helper.name, 0) + helper.count
+        helpers[helper.name] = CargoHelper(helper.name, helper.each_mass)
+    capacity = power.net_force(grade=grade, power_ratio=power_ratio)
+    if capacity <= 0:
+        raise ValueError("power can't climb grade on its own")
+    per_pound = (grade + 0.004) / math.sqrt(grade * grade + 1)
+    budget = capacity / per_pound
+    cargo_mass = sum(helpers[x].each_mass * n for x, n in counts.items())
+    bound = trip_lower_bound(power, cargo_mass * difficulty.multiplier,
+            grade, power_ratio)
+
+    covers = _coverage(cars, tuple(counts))
+    if not covers(0, tuple(counts.values())):
+        raise ValueError("cargo doesn't fit in cars")
+
+    if len(helpers) <= 4:
+        orders = itertools.permutations(helpers.values())
+    else:
+        by_mass = sorted(helpers.values(),
+                key=operator.attrgetter('each_mass'))
+        orders = (by_mass[::-1], by_mass)
+
+    best = None
+    for order, partial in itertools.product(orders, (True, False)):
+        loads = _greedy_loads(cars, counts, order, budget, partial,
+                keep_empty, covers)
+        train = stock.Train(
+                car(cargo=helper * count) if helper else car()
+                for car, helper, count in loads)
+        forces = stock.net_forces(
+                map(operator.attrgetter('mass'), train),
+                map(operator.attrgetter('tractive_effort'), train),
+                grade,
+                power_ratio)
+        split = splitter.quicksplit(capacity, forces)
+        if split is None:
+            continue
+        score = (len(split), len(train), train.mass)
+        if best is None or score < best[0]:
+            best = score, train
+            if len(split) <= bound:
+                break
+    if best is None:
+        raise ValueError("loaded cars are too heavy to climb grade")
+    return power + best[1]
@@ -0,0 +1,196 @@
+import hashlib
+import math
+import mmap
+import os
+import railroads_hillclimber.prepper as prepper
+import railroads_hillclimber.splitter as splitter
+import railroads_hillclimber.stock as stock
+import struct
+import tempfile
+from typing import Iterable, Optional, Tuple
+
+_MAGIC = b'RHPS\x03\x00\x00\x00'
+_HEADER = struct.Struct('<8sQ')
+# fingerprint, grade, power_ratio, collect_net, plan offset
+_RECORD = struct.Struct('<16sdd?Q')
+_KEY_SIZE = _RECORD.size - 8
+_PLAN = struct.Struct('<II')
+_NO_SPLIT = 0xFFFFFFFF
+
+def fingerprint(train: stock.Train) -> bytes:
+    """Compute a 16-byte digest identifying the units in train, in order.
+
+    Units with the same type, name, mass, tractive effort and length hash
+    the same way, so equal consists built separately share plans.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    def feed(units):
+        for x in units:
+            h.update(type(x).__name__.encode())
+            h.update(b'\x00')
+            h.update(x.name.encode())
+            h.update(b'\x00')
+            length = math.nan if x.length is None else x.length
+            h.update(struct.pack('<ddd', x.mass, x.tractive_effort, length))
+            if isinstance(x, stock.CarGroup):
+                h.update(b'(')
+                feed(x.train)
+                h.update(b')')
+    feed(train)
+    return h.digest()
+
+def _key(train, grade, power_ratio, collect_net):
+    # Adding 0.0 turns -0.0 into 0.0, so both find the same plan.
+    return _RECORD.pack(fingerprint(train), grade + 0.0,
+            power_ratio + 0.0, collect_net, 0)[:_KEY_SIZE]
+
+def solve_plan(
+        train: stock.Train,
+        grade: float,
+        *,
+        power_ratio: float = 1.0,
+        collect_net: bool = False) -> Tuple[int, Optional[Tuple[int]]]:
+    """Compute the front power length and splits compute_climb would use.
+
+    The second element is None if the cut can't be split, including when
+    the front power can't climb grade on its own.
+    """
+    power_len = prepper.collect_front_len(train, grade, power_ratio)
+    power = stock.Train(train[:power_len])
+    cut = stock.Train(train[power_len:])
+    return power_len, splitter.compute_split(power, cut, grade,
+            power_ratio=power_ratio,
+            collect_net=collect_net)
+
+def write_plans(
+        path: str,
+        problems: Iterable[Tuple[stock.Train, float, float, bool]]) -> int:
+    """Solve every problem and write the plans to a new store at path.
+
+    Each problem is a tuple of (train, grade, power_ratio, collect_net).
+    Plans are keyed on the exact grade and power_ratio they were solved
+    with, so a lookup always gives what solving would. Returns the number
+    of distinct plans written.
+    """
+    plans = {}
+    for train, grade, power_ratio, collect_net in problems:
+        key = _key(train, grade, power_ratio, collect_net)
+        if key not in plans:
+            plans[key] = solve_plan(train, grade,
+                    power_ratio=power_ratio,
+                    collect_net=collect_net)
+    keys = sorted(plans)
+    offset = _HEADER.size + _RECORD.size * len(keys)
+    # Write beside path and move it into place, so processes opening path
+    # see either the old store or the new one, never a partial file.
+    fd, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(path)),
+            prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, len(keys)))
+            for key in keys:
+                power_len, splits = plans[key]
+                f.write(key + struct.pack('<Q', offset))
+                offset += _PLAN.size + 4 * len(splits or ())
+            for key in keys:
+                power_len, splits = plans[key]
+                if splits is None:
+                    f.write(_PLAN.pack(power_len, _NO_SPLIT))
+                else:
+                    f.write(_PLAN.pack(power_len, len(splits)))
+                    f.write(struct.pack(f'<{len(splits)}I', *splits))
+        # mkstemp makes the file private; give it the usual permissions.
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temp_path, 0o666 & ~umask)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return len(keys)
+
+class PlanStore:
+    """Read-only, memory-mapped view of plans written by write_plans.
+
+    The file is mapped rather than read, so many processes opening the same
+    store share a single copy in the page cache. Lookups are a binary search
+    over the sorted index.
+    """
+
+    def __init__(self, path: str):
+        """Open the store at path."""
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._check(path)
+        except BaseException:
+            self._map.close()
+            raise
+
+    def _check(self, path):
+        """Make sure the mapped file is a complete plan store."""
+        size = len(self._map)
+        if size < _HEADER.size:
+            raise ValueError(f"{path} is not a plan store")
+        magic, self._count = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a plan store")
+        end = _HEADER.size + self._count * _RECORD.size
+        if self._count > 0 and end <= size:
+            # Plans are laid out in index order, so the last one ends the file.
+            offset, = struct.unpack_from('<Q', self._map, end - 8)
+            if offset + _PLAN.size <= size:
+                _, n = _PLAN.unpack_from(self._map, offset)
+                end = offset + _PLAN.size + 4 * (0 if n == _NO_SPLIT else n)
+            else:
+                end = offset + _PLAN.size
+        if end != size:
+            raise ValueError(f"{path} is truncated or corrupt: expected "
+                    f"{end} bytes, found {size}")
+
+    def __len__(self):
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Unmap the store."""
+        self._map.close()
+
+    def lookup(
+            self,
+            train: stock.Train,
+            grade: float,
+            *,
+            power_ratio: float = 1.0,
+            collect_net: bool = False
+            ) -> Optional[Tuple[int, Optional[Tuple[int]]]]:
+        """Find the plan for a problem, as returned by solve_plan.
+
+        Returns None unless the store has a plan solved for exactly this
+        train, grade, power_ratio and collect_net.
+        """
+        key = _key(train, grade, power_ratio, collect_net)
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = _HEADER.size + mid * _RECORD.size
+            found = self._map[start:start+_KEY_SIZE]
+            if found < key:
+                lo = mid + 1
+            elif found > key:
+                hi = mid
+            else:
+                offset, = struct.unpack_from(
+                        '<Q', self._map, start + _KEY_SIZE)
+                power_len, n = _PLAN.unpack_from(self._map, offset)
+                if n == _NO_SPLIT:
+                    return power_len, None
+                return power_len, struct.unpack_from(
+                        f'<{n}I', self._map, offset + _PLAN.size)
+        return None
@@ -1,15 +1,39 @@
 from railroads_hillclimber import stock as stock
+from typing import Optional
+import types
+import weakref
+
+_interned = weakref.WeakValueDictionary()
+
+def _intern(key, make):
+    """Return the live instance stored under key, creating it with make() if
+    there isn't one.
+
+    The instance is frozen (see stock.RollingStock), so factories can
+    safely share it between all identical products.
+    """
+    try:
+        return _interned[key]
+    except KeyError:
+        result = make()
+        result._freeze()
+        _interned[key] = result
+        return result
 
 def SoloLocomotiveFactory(
         default_name: str,
         mass: float,
-        tractive_effort: float):
+        tractive_effort: float,
+        length: Optional[float] = None):
     def inner(name: str = default_name):
-        return stock.TractiveCar(
+        return _intern(
+            (stock.TractiveCar, name, mass, tractive_effort, length),
+            lambda: stock.TractiveCar(
                 name=name,
                 mass=mass,
                 tractive_effort=tractive_effort,
-            )
+                length=length,
+            ))
     inner.__doc__ = f"""Make a {default_name} locomotive.
 
     name -- Name to assign the locomotive.
@@ -20,21 +44,33 @@ def TenderLocomotiveFactory(
         default_name: str,
         locomotive_mass: float,
         tender_mass: float,
-        tractive_effort: float):
+        tractive_effort: float,
+        locomotive_length: Optional[float] = None,
+        tender_length: Optional[float] = None):
     def inner(name: str = default_name):
-        locomotive = stock.TractiveCar(
+        locomotive = _intern(
+            (stock.TractiveCar, name, locomotive_mass, tractive_effort,
+                locomotive_length),
+            lambda: stock.TractiveCar(
                 name=name,
                 mass=locomotive_mass,
                 tractive_effort=tractive_effort,
-            )
-        tender = stock.Car(
-                name=name+' (Tender)',
+                length=locomotive_length,
+            ))
+        tender_name = name+' (Tender)'
+        tender = _intern(
+            (stock.Car, tender_name, tender_mass, 0, tender_length),
+            lambda: stock.Car(
+                name=tender_name,
                 mass=tender_mass,
-            )
-        return stock.CarGroup(
+                length=tender_length,
+            ))
+        return _intern(
+            (stock.CarGroup, name, locomotive, tender),
+            lambda: stock.CarGroup(
                 name=name,
                 train=(locomotive, tender),
-            )
+            ))
     inner.__doc__ = f"""Make a {default_name} locomotive and tender.
 
     name -- Name to assign the locomotive and group.
@@ -104,7 +140,8 @@ class difficulty:
 def CarFactory(
         default_name: str,
         empty_mass: float,
-        permitted_cargo: dict = {}):
+        permitted_cargo: dict = {},
+        length: Optional[float] = None):
     permitted_base_names = {x.name: a for x,a in permitted_cargo.items()}
     def inner(name=None, cargo=None):
         global cargo_mass_multiplier
@@ -116,7 +153,9 @@ def CarFactory(
             if name is None:
                 used_name = f"{used_name} ({cargo_desc})"
             mass += cargo_mass * difficulty.multiplier
-        return stock.Car(name=used_name, mass=mass)
+        return _intern(
+            (stock.Car, used_name, mass, 0, length),
+            lambda: stock.Car(name=used_name, mass=mass, length=length))
     if len(permitted_cargo)>0:
         inner.__doc__ = f"""Create a {default_name} cargo car.
 
@@ -130,4 +169,7 @@ def CarFactory(
         name -- Name to assign the car.
         cargo -- Unused, leave as the default value.
         """
+    # Exposed for load planning; maps cargo names to the most a car can hold.
+    inner.empty_mass = empty_mass
+    inner.permitted_cargo = types.MappingProxyType(permitted_base_names)
     return inner
@@ -1,6 +1,6 @@
 import itertools
 import operator
-from railroads_hillclimber.stock import Train
+from railroads_hillclimber.stock import Train, net_forces
 from typing import Generator, Tuple
 
 def cluster_forces(
@@ -18,12 +18,11 @@ def cluster_forces(
     In each pair, the first element is the length of the subgroup, while the
     second element is the total net force within the subgroup.
     """
-    forces = map(
-            operator.methodcaller(
-                'net_force',
-                grade=grade, 
-                power_ratio=power_ratio),
-            train)
+    forces = net_forces(
+            map(operator.attrgetter('mass'), train),
+            map(operator.attrgetter('tractive_effort'), train),
+            grade,
+            power_ratio)
     groups = map(tuple, map(
         operator.itemgetter(1),
         itertools.groupby(forces, lambda x: x>0)))
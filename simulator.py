@@ -0,0 +1,197 @@
+import collections
+import itertools
+import math
+import operator
+import railroads_hillclimber.splitter as splitter
+import railroads_hillclimber.stock as stock
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+CostModel = collections.namedtuple('CostModel',
+        'grade_length coupling_seconds max_speed min_speed descent_speed',
+        defaults=(1000.0, 30.0, 15.0, 2.0, 15.0))
+CostModel.__doc__ = """Parameters used to estimate how long moves take.
+
+grade_length -- Length of the grade, in feet.
+coupling_seconds -- Time taken by each coupling or uncoupling, in seconds.
+max_speed -- Speed up the grade with all of the applied tractive effort to
+spare, in miles per hour.
+min_speed -- Speed up the grade with none of it to spare, in miles per hour.
+descent_speed -- Speed of light engines heading back down, in miles per hour.
+"""
+
+Move = collections.namedtuple('Move', 'kind train seconds')
+Move.__doc__ = """A single switching move.
+
+kind -- One of 'couple', 'uncouple', 'climb' or 'descend'.
+train -- The train making the move, or the power doing the (un)coupling.
+seconds -- Estimated duration of the move.
+"""
+
+def climb_speed(
+        net_force: float,
+        applied_effort: float,
+        model: CostModel = CostModel()) -> float:
+    """Estimate the speed up the grade, in miles per hour.
+
+    The speed is interpolated between model.min_speed and model.max_speed by
+    the fraction of the applied tractive effort left over as net force.
+    """
+    spare = min(max(net_force / applied_effort, 0.0), 1.0)
+    return model.min_speed + (model.max_speed - model.min_speed) * spare
+
+def _travel_seconds(feet, mph):
+    return feet * 3600 / (mph * 5280)
+
+def expand(
+        trips: Sequence[Tuple[stock.Train, Optional[stock.Train]]],
+        grade: float,
+        *,
+        power_ratio: float = 1.0,
+        model: CostModel = CostModel()) -> List[Move]:
+    """Expand trips, as returned by compute_climb, into individual moves.
+
+    For every trip but the first, the power couples onto the next subcut at
+    the bottom and the subcut is coupled onto the cars already at the top.
+    For every trip but the last, the subcut is uncoupled from the rest of the
+    train at the bottom and the power uncouples from it at the top before
+    descending.
+    """
+    moves = []
+    last = len(trips) - 1
+    for k, (up, down) in enumerate(trips):
+        if k > 0:
+            moves.append(Move('couple', up, model.coupling_seconds))
+        if k < last:
+            moves.append(Move('uncouple', up, model.coupling_seconds))
+        speed = climb_speed(
+                up.net_force(grade, power_ratio),
+                up.tractive_effort * power_ratio,
+                model)
+        moves.append(Move('climb', up,
+            _travel_seconds(model.grade_length, speed)))
+        if k > 0:
+            moves.append(Move('couple', up, model.coupling_seconds))
+        if down is not None:
+            moves.append(Move('uncouple', down, model.coupling_seconds))
+            moves.append(Move('descend', down,
+                _travel_seconds(model.grade_length, model.descent_speed)))
+    return moves
+
+class _Columns:
+    """Prefix sums over a cut, so the time of any trip is O(1) to find.
+
+    The power for a trip starting at unit i is the original power plus every
+    unit before i that can climb on its own, as in compute_climb.
+    """
+
+    def __init__(self, power, cut, grade, power_ratio, model):
+        self.n = len(cut)
+        self.power_ratio = power_ratio
+        self.model = model
+        self.root = math.sqrt(grade * grade + 1)
+        self.slope = grade + 0.004
+        masses = tuple(map(operator.attrgetter('mass'), cut))
+        efforts = tuple(map(operator.attrgetter('tractive_effort'), cut))
+        self.forces = stock.net_forces(masses, efforts, grade, power_ratio)
+        climbers = tuple(x > 0 for x in self.forces)
+        self.mass = tuple(itertools.accumulate(masses, initial=0.0))
+        self.effort = tuple(itertools.accumulate(efforts, initial=0.0))
+        self.climber_mass = tuple(itertools.accumulate(
+            (m if c else 0.0 for m, c in zip(masses, climbers)),
+            initial=power.mass))
+        self.climber_effort = tuple(itertools.accumulate(
+            (f if c else 0.0 for f, c in zip(efforts, climbers)),
+            initial=power.tractive_effort))
+        self.descent = _travel_seconds(model.grade_length, model.descent_speed)
+
+    def trip_seconds(self, i, j):
+        """Time taken by the trip bringing up units i up to j."""
+        model = self.model
+        mass = self.climber_mass[i] + self.mass[j] - self.mass[i]
+        effort = (self.climber_effort[i] + self.effort[j] - self.effort[i]
+                ) * self.power_ratio
+        speed = climb_speed(
+                effort - mass * self.slope / self.root, effort, model)
+        seconds = _travel_seconds(model.grade_length, speed)
+        if i > 0:
+            seconds += 2 * model.coupling_seconds
+        if j < self.n:
+            seconds += 2 * model.coupling_seconds + self.descent
+        return seconds
+
+    def split_seconds(self, split):
+        """Time taken by the whole of split."""
+        return sum(itertools.starmap(self.trip_seconds, zip(
+            itertools.accumulate(split, initial=0),
+            itertools.accumulate(split))))
+
+def rank_splits(
+        power: stock.Calculative,
+        cut: stock.Train,
+        splits: Iterable[Sequence[int]],
+        grade: float,
+        *,
+        power_ratio: float = 1.0,
+        model: CostModel = CostModel()) -> List[Tuple[float, Tuple[int]]]:
+    """Score many splits of the same cut, fastest first.
+
+    Each split is scored in time proportional to its number of subcuts,
+    after a single pass over cut. The result pairs each split with its
+    estimated time in seconds.
+    """
+    columns = _Columns(power, cut, grade, power_ratio, model)
+    return sorted(((columns.split_seconds(x), tuple(x)) for x in splits),
+            key=operator.itemgetter(0))
+
+def fastest_split(
+        power: stock.Calculative,
+        cut: stock.Train,
+        grade: float,
+        *,
+        power_ratio: float = 1.0,
+        collect_net: bool = False,
+        max_length: Optional[float] = None,
+        max_cars: Optional[int] = None,
+        model: CostModel = CostModel()
+        ) -> Optional[Tuple[float, Tuple[int]]]:
+    """Find the split of cut that takes the least time to bring up grade.
+
+    Subcuts must be valid by the same rules as compute_split, but may be
+    more numerous if that is faster overall. O(n⋅w) on the cut length, with
+    w as for splitter.boundedsplit.
+
+    The result pairs the estimated time in seconds with the split, or is
+    None if cut can't be split, including when power can't climb grade.
+    """
+    capacity = power.net_force(grade=grade, power_ratio=power_ratio)
+    if capacity <= 0:
+        return None
+    columns = _Columns(power, cut, grade, power_ratio, model)
+    n = columns.n
+    reach = splitter.subcut_reach(n, splitter.cut_limits(cut,
+        max_length=max_length, max_cars=max_cars))
+    positive = tuple(itertools.accumulate(
+        (x if x > 0 else 0.0 for x in columns.forces),
+        initial=0.0))
+    # best[i] holds the least time for the units from i onwards, and step[i]
+    # the length of the first subcut achieving it.
+    best = [None] * (n+1)
+    step = [None] * (n+1)
+    best[n] = 0.0
+    for start in range(n-1, -1, -1):
+        force = capacity + (positive[start] if collect_net else 0.0)
+        for end in range(start+1, reach[start]+1):
+            force += columns.forces[end-1]
+            if force > 0 and best[end] is not None:
+                seconds = columns.trip_seconds(start, end) + best[end]
+                if best[start] is None or seconds <= best[start]:
+                    best[start] = seconds
+                    step[start] = end - start
+    if best[0] is None:
+        return None
+    split = []
+    start = 0
+    while start < n:
+        split.append(step[start])
+        start += step[start]
+    return best[0], tuple(split)
@@ -1,8 +1,8 @@
 import functools
 import itertools
 import operator
-from railroads_hillclimber.stock import Calculative, Train
-from typing import Iterable, Iterator, Sequence, Tuple
+from railroads_hillclimber.stock import Calculative, Train, net_forces
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
 
 def quicksplit(
         capacity: float,
@@ -22,7 +22,7 @@ def quicksplit(
                 itertools.count(),
                 itertools.chain(cut, (0.0,))):
             remaining_capacity += next_force
-            if remaining_capacity < 0:
+            if remaining_capacity <= 0:
                 break
         if take_len==0:
             return None
@@ -131,13 +131,128 @@ def smartsplit(
 
     return f(cut, len(cut))
 
+def subcut_reach(
+        n: int,
+        limits: Iterable[Tuple[float, Sequence[float]]] = ()) -> List[int]:
+    """Find how far a subcut can extend under limits.
+
+    Element i of the result is one past the last of the n units that can
+    share a subcut starting with unit i, considering only the limits (see
+    boundedsplit). It equals i if unit i doesn't fit on its own.
+    """
+    reach = [n] * n
+    for maximum, sizes in limits:
+        end = 0
+        total = 0.0
+        for start in range(n):
+            if end < start:
+                end = start
+                total = 0.0
+            while end < n and total + sizes[end] <= maximum:
+                total += sizes[end]
+                end += 1
+            reach[start] = min(reach[start], end)
+            if end > start:
+                total -= sizes[start]
+    return reach
+
+def boundedsplit(
+        capacity: float,
+        cut: Sequence[float],
+        limits: Iterable[Tuple[float, Sequence[float]]] = (),
+        collect_net: bool = False) -> Tuple[int]:
+    """Run the Boundedsplit algorithm.
+
+    Worst case O(n⋅w), where w is the largest number of units that fit in a
+    single subcut; optimal in all cases.
+
+    capacity -- Amount of head force capacity available.
+    cut -- Forces for each unit in the cut.
+    limits -- Pairs of a maximum and the sizes of each unit in the cut. The
+    sizes of the units in every subcut must total no more than the maximum.
+    collect_net -- If True, when a subcut has a positive force, it is added
+    to power for future subcuts.
+    """
+    assert capacity > 0
+    n = len(cut)
+    reach = subcut_reach(n, limits)
+    if any(itertools.starmap(operator.eq, zip(reach, range(n)))):
+        return None
+
+    if collect_net:
+        # Taking the longest valid subcut never hurts: the positive units it
+        # takes are added back as capacity, and the rest start later.
+        splits = []
+        start = 0
+        while start < n:
+            forces = tuple(itertools.accumulate(
+                cut[start:reach[start]], initial=capacity))
+            for this_len in range(len(forces)-1, 0, -1):
+                if forces[this_len] > 0:
+                    break
+            else:
+                return None
+            splits.append(this_len)
+            capacity += sum(x for x in cut[start:start+this_len] if x>0)
+            start += this_len
+        return tuple(splits)
+
+    # count[i] holds the fewest subcuts for the units from i onwards, and
+    # step[i] the length of the first of them. Ties keep the longest first
+    # subcut, matching the other algorithms.
+    count = [None] * (n+1)
+    step = [None] * (n+1)
+    count[n] = 0
+    for start in range(n-1, -1, -1):
+        force = capacity
+        for end in range(start+1, reach[start]+1):
+            force += cut[end-1]
+            if force > 0 and count[end] is not None and (
+                    count[start] is None or count[end] < count[start]):
+                count[start] = count[end] + 1
+                step[start] = end - start
+    if count[0] is None:
+        return None
+    splits = []
+    start = 0
+    while start < n:
+        splits.append(step[start])
+        start += step[start]
+    return tuple(splits)
+
+def cut_limits(
+        cut: Train,
+        *,
+        max_length: Optional[float] = None,
+        max_cars: Optional[int] = None
+        ) -> List[Tuple[float, Tuple[float]]]:
+    """Build the limits argument of boundedsplit for the units in cut.
+
+    max_length -- If not None, the longest each subcut may be, in feet.
+    Every unit in cut must then have a known length.
+    max_cars -- If not None, the most individual cars each subcut may have.
+    """
+    limits = []
+    if max_length is not None:
+        lengths = tuple(map(operator.attrgetter('length'), cut))
+        if None in lengths:
+            unknown = cut[lengths.index(None)]
+            raise ValueError(f"length of {unknown.name} is unknown")
+        limits.append((max_length, lengths))
+    if max_cars is not None:
+        limits.append((max_cars,
+            tuple(map(operator.attrgetter('car_count'), cut))))
+    return limits
+
 def compute_split(
         power: Calculative,
         cut: Train,
         grade: float,
         *,
         power_ratio: float = 1.0,
-        collect_net: bool = False) -> Tuple[int]:
+        collect_net: bool = False,
+        max_length: Optional[float] = None,
+        max_cars: Optional[int] = None) -> Tuple[int]:
     """Compute splits for the given cut such that each subcut can be pulled up
     grade by power.
 
@@ -151,12 +266,26 @@ def compute_split(
     collect_net -- After a subcut is brought up the hill, should units in it
     that are capable of making the grade under their own power be added to
     the power for future subcuts?
+    max_length -- If not None, the longest each subcut may be, in feet.
+    max_cars -- If not None, the most individual cars each subcut may have.
+
+    Returns None if there is no valid split, including when power can't
+    climb grade on its own.
     """
     p = power.net_force(grade=grade, power_ratio=power_ratio)
-    c = tuple(map(
-        operator.methodcaller('net_force', grade=grade, power_ratio=power_ratio),
-        cut))
-    if max(c) <= 0.0:
+    if p <= 0:
+        return None
+    elif len(cut) == 0:
+        return ()
+    c = tuple(net_forces(
+        map(operator.attrgetter('mass'), cut),
+        map(operator.attrgetter('tractive_effort'), cut),
+        grade,
+        power_ratio))
+    limits = cut_limits(cut, max_length=max_length, max_cars=max_cars)
+    if limits:
+        return boundedsplit(p, c, limits, collect_net=collect_net)
+    elif max(c) <= 0.0:
         return quicksplit(p, c)
     elif collect_net is True:
         return fastsplit(p, c, collect_net=True)
@@ -1,7 +1,72 @@
 from abc import ABC, abstractmethod
 import collections.abc
+import itertools
 import math
 import operator
+from typing import Iterable, List, Union
+
+def _maximum_grade(M, F):
+    """Closed form of the maximum grade for mass M and applied force F.
+
+    This is the smaller root of F²⋅(α² + 1) = M²⋅(α + μ)², rearranged so it
+    stays finite when F = M. There is no root once F² ≥ M²⋅(μ² + 1), since
+    then the stock can lift its own weight on any grade.
+    """
+    if F == 0:
+        return math.nan
+    D = M**2 * (0.004**2 + 1) - F**2
+    if D <= 0:
+        return math.inf
+    return (F**2 - M**2 * 0.004**2) / (M**2 * 0.004 + F * math.sqrt(D))
+
+def _column(x):
+    """Repeat x indefinitely unless it is already iterable."""
+    if isinstance(x, collections.abc.Iterable):
+        return x
+    else:
+        return itertools.repeat(x)
+
+def net_forces(
+        masses: Iterable[float],
+        tractive_efforts: Iterable[float],
+        grade: float,
+        power_ratios: Union[float, Iterable[float]] = 1.0) -> List[float]:
+    """Compute Calculative.net_force for columns of masses and tractive
+    efforts at once.
+
+    power_ratios may be a single ratio or one for each unit.
+    """
+    root = math.sqrt(grade * grade + 1)
+    slope = grade + 0.004
+    return [F * r - M * slope / root for M, F, r in zip(
+        masses, tractive_efforts, _column(power_ratios))]
+
+def spare_capacities(
+        masses: Iterable[float],
+        tractive_efforts: Iterable[float],
+        grade: float,
+        power_ratios: Union[float, Iterable[float]] = 1.0) -> List[float]:
+    """Compute Calculative.spare_capacity for columns of masses and tractive
+    efforts at once.
+
+    power_ratios may be a single ratio or one for each unit.
+    """
+    root = math.sqrt(grade * grade + 1)
+    slope = grade + 0.004
+    return [F * r * root / slope - M for M, F, r in zip(
+        masses, tractive_efforts, _column(power_ratios))]
+
+def maximum_grades(
+        masses: Iterable[float],
+        tractive_efforts: Iterable[float],
+        power_ratios: Union[float, Iterable[float]] = 1.0) -> List[float]:
+    """Compute Calculative.maximum_grade for columns of masses and tractive
+    efforts at once.
+
+    power_ratios may be a single ratio or one for each unit.
+    """
+    return [_maximum_grade(M, F * r) for M, F, r in zip(
+        masses, tractive_efforts, _column(power_ratios))]
 
 class Calculative(ABC):
     """Abstract base class that provides grade-related calculations.
@@ -20,6 +85,8 @@ class Calculative(ABC):
     F = total force (pounds of force)
     """
 
+    __slots__ = ()
+
     @property
     @abstractmethod
     def mass(self):
@@ -51,15 +118,12 @@ class Calculative(ABC):
                 * math.sqrt(grade * grade + 1) / (grade + 0.004) - self.mass)
 
     def maximum_grade(self, power_ratio=1.0):
-        """The maximum grade this rolling stock can climb under its own power."""
-        F = self.tractive_effort * power_ratio
-        if F==0:
-            return math.nan
-        else:
-            M = self.mass
-            return ((M**2 * 0.004 - F * math.sqrt(
-                    M**2 * (0.004**2 + 1) - F**2))
-                / (F**2 - M**2))
+        """The maximum grade this rolling stock can climb under its own power.
+
+        This is math.inf if the rolling stock can lift its own weight, or
+        math.nan if it has no tractive effort.
+        """
+        return _maximum_grade(self.mass, self.tractive_effort * power_ratio)
 
     def net_force(self, grade, power_ratio=1.0):
         """Compute the net force applied by this rolling stock on grade with
@@ -77,7 +141,40 @@ class Calculative(ABC):
         return self.net_force(grade, power_ratio) > 0
 
 class RollingStock(Calculative, ABC):
-    """Abstract base class for everything that's treated as rolling stock."""
+    """Abstract base class for everything that's treated as rolling stock.
+
+    Instances shared between trains by prefab.factory are frozen, so a
+    stray write can't change every train using them; any other rolling
+    stock may be modified as usual.
+    """
+
+    __slots__ = ('_frozen',)
+
+    def _freeze(self):
+        """Reject attribute writes and deletes from now on."""
+        object.__setattr__(self, '_frozen', True)
+
+    def __setattr__(self, name, value):
+        if getattr(self, '_frozen', False):
+            raise AttributeError(f"{type(self).__name__} is immutable")
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        if getattr(self, '_frozen', False):
+            raise AttributeError(f"{type(self).__name__} is immutable")
+        object.__delattr__(self, name)
+
+    def __setstate__(self, state):
+        # Used by pickle and copy, which would otherwise go through
+        # __setattr__ on frozen copies. Slotted state arrives as
+        # (__dict__ or None, {slot: value}), anything else as __dict__.
+        if isinstance(state, tuple):
+            state, slots = state
+        else:
+            slots = {}
+        for name, value in itertools.chain((state or {}).items(),
+                slots.items()):
+            object.__setattr__(self, name, value)
 
     @property
     @abstractmethod
@@ -85,6 +182,18 @@ class RollingStock(Calculative, ABC):
         """Name assigned to the rolling stock."""
         pass
 
+    @property
+    @abstractmethod
+    def length(self):
+        """Length of the rolling stock, in feet, or None if unknown."""
+        pass
+
+    @property
+    @abstractmethod
+    def car_count(self):
+        """Number of individual cars making up the rolling stock."""
+        pass
+
     def __str__(self):
         return self.name
 
@@ -117,14 +226,18 @@ class RollingStock(Calculative, ABC):
 class Car(RollingStock):
     """Base class for individual pieces of rolling stock."""
 
-    def __init__(self, *, name, mass):
+    __slots__ = ('_name', '_mass', '_length', '__weakref__')
+
+    def __init__(self, *, name, mass, length=None):
         """Create an individual piece of rolling stock.
 
         name -- The name to assign to the entity.
         mass -- The mass of the entity, in pounds.
+        length -- The length of the entity, in feet, or None if unknown.
         """
         self._name = name
         self._mass = mass
+        self._length = length
 
     @property
     def name(self):
@@ -136,6 +249,16 @@ class Car(RollingStock):
         """Mass of the rolling stock, in pounds."""
         return self._mass
 
+    @property
+    def length(self):
+        """Length of the rolling stock, in feet, or None if unknown."""
+        return self._length
+
+    @property
+    def car_count(self):
+        """Number of individual cars making up the rolling stock."""
+        return 1
+
     @property
     def tractive_effort(self):
         """Tractive effort of the rolling stock, in pounds of force."""
@@ -146,15 +269,18 @@ class TractiveCar(Car):
     effort.
     """
 
-    def __init__(self, name, mass, tractive_effort):
+    __slots__ = ('_tractive_effort',)
+
+    def __init__(self, name, mass, tractive_effort, length=None):
         """Create a piece of rolling stock that applies a tractive effort.
 
         name -- The name to assign to the entity.
         mass -- The mass of the entity, in pounds.
         tractive_effort -- The amount of tractive effort provided, in pounds
         of force.
+        length -- The length of the entity, in feet, or None if unknown.
         """
-        super().__init__(name=name, mass=mass)
+        super().__init__(name=name, mass=mass, length=length)
         self._tractive_effort = tractive_effort
 
     @property
@@ -239,6 +365,24 @@ class Train(collections.abc.Sequence, Calculative):
         """Total tractive effort of the rolling stock, in pounds of force."""
         return sum(map(operator.attrgetter('tractive_effort'), self))
 
+    @property
+    def length(self):
+        """Total length of the rolling stock, in feet, or None if the length
+        of any of it is unknown."""
+        lengths = tuple(map(operator.attrgetter('length'), self))
+        if None in lengths:
+            return None
+        return sum(lengths)
+
+    @property
+    def car_count(self):
+        """Total number of individual cars in the train.
+
+        CarGroup instances count once for each car they contain, so e.g. a
+        tendered locomotive counts as two cars.
+        """
+        return sum(map(operator.attrgetter('car_count'), self))
+
     def tractive_units(self):
         """Iterate over units in the train that provide tractive effort."""
         for x in self:
@@ -285,6 +429,8 @@ class CarGroup(RollingStock):
     to treat them as a single car (e.g. computing splits for hillclimbing).
     """
 
+    __slots__ = ('_name', '_train', '__weakref__')
+
     def __init__(self, name, train):
         """Construct a CarGroup from a Train, iterable, or (generally not
         recommended) single piece of rolling stock.
@@ -316,6 +462,16 @@ class CarGroup(RollingStock):
         """Tractive effort of the rolling stock, in pounds of force."""
         return self._train.tractive_effort
 
+    @property
+    def length(self):
+        """Length of the rolling stock, in feet, or None if unknown."""
+        return self._train.length
+
+    @property
+    def car_count(self):
+        """Number of individual cars making up the rolling stock."""
+        return self._train.car_count
+
     def reversed(self):
         """Return a CarGroup with the order of cars reversed."""
         return CarGroup(self._name, reversed(self._train))